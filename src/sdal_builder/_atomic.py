@@ -0,0 +1,31 @@
+"""
+Atomic file replacement
+———————————————
+Downloads and caches in the work directory are trusted whenever they
+exist, so an interrupted run must never leave one half-written.
+``atomic_path`` hands out a temporary sibling to write to and moves it
+over the destination only once the write has finished.
+"""
+from __future__ import annotations
+
+import os
+import pathlib
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def atomic_path(dest: pathlib.Path) -> Iterator[pathlib.Path]:
+    """
+    Yield a temporary path next to *dest* (same extension, so writers that
+    infer or append it keep working) and ``os.replace`` it onto *dest* when
+    the block completes; on error the temporary file is removed instead.
+    """
+    tmp = dest.with_name(f"{dest.stem}.tmp{dest.suffix}")
+    try:
+        yield tmp
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+    os.replace(tmp, dest)
@@ -2,6 +2,9 @@ EOF = "_EOF"
 """SDAL constants & FULL Huffman table (OEM v1.7, 256 entries, for dahuffman)."""
 
 PARCEL_HEADER_FMT = 'u16u32u32u16u16u8u8'
+# Every header field is byte-aligned, so the same big-endian layout can be
+# packed with the (much faster) stdlib ``struct`` module.
+PARCEL_HEADER_STRUCT_FMT = '>HIIHHBB'
 PARCEL_HEADER_LEN = 24
 
 HUFFMAN_TABLE = {
@@ -234,7 +237,11 @@ DENS_PARCEL_ID    = 140  # Density overlay parcel ID
 
 # New POI parcel ID for “all POI categories” overlay
 POI_NAME_PARCEL_ID   = 170  # Names of POIs
-POI_GEOM_PARCEL_ID   = 180  # Raw geometry payload (lat/lon) for each POI
-POI_INDEX_PARCEL_ID  = 190  # B+-tree index for POI offsets
+POI_GEOM_PARCEL_ID   = 180  # Packed geometry payloads (lat/lon) of all POIs
+POI_INDEX_PARCEL_ID  = 190  # POI offset index: SDOT sorted offset table (B+-tree with --bplustree)
+
+# Dictionary-encoded variants of the name parcels (see encoder.encode_strings_dict)
+NAV_DICT_PARCEL_ID      = 121  # Road names: unique-string table + per-road index
+POI_NAME_DICT_PARCEL_ID = 171  # POI names: unique-string table + per-POI index
 
 UNCOMPRESSED_FLAG = 0
@@ -1,35 +1,133 @@
-import bitstruct, zlib, io, struct
+import struct
 from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
 # Removed dahuffman dependency to avoid KeyError issues
 
-from .constants import PARCEL_HEADER_FMT, HUFFMAN_TABLE
+# zlib-ng computes the same CRC-32 as zlib but with SIMD (PCLMULQDQ) folding;
+# fall back to the stdlib when it is not installed.
+try:
+    from zlib_ng.zlib_ng import crc32
+except ImportError:
+    from zlib import crc32
+
+from .constants import PARCEL_HEADER_STRUCT_FMT, HUFFMAN_TABLE
 
 # Convert bitstring table -> (bitsize, value) tuples required by HuffmanCodec
 # code_table = {sym: (len(bits), int(bits, 2)) for sym, bits in HUFFMAN_TABLE.items()}
 
-def _hdr(pid: int, body: bytes) -> bytes:
-    crc = zlib.crc32(body) & 0xFFFFFFFF
-    return bitstruct.pack(PARCEL_HEADER_FMT, pid, len(body), crc, 0, 1, 0, 0)
+_HDR = struct.Struct(PARCEL_HEADER_STRUCT_FMT)
+
+
+def _hdr(pid: int, body: bytes, aux: int = 0) -> bytes:
+    # The last (otherwise reserved) byte carries a parcel-specific value,
+    # e.g. the bits per cell of a DENS parcel.
+    crc = crc32(body) & 0xFFFFFFFF
+    return _HDR.pack(pid, len(body), crc, 0, 1, 0, aux)
 
 # Encode raw bytes without compression
 
 def encode_strings(pid: int, strings: List[str]) -> bytes:
-    raw = b''.join(s.encode('utf8') + b'\x00' for s in strings)
+    # NUL-terminated UTF-8: one join + one encode instead of one per string
+    raw = ('\x00'.join(strings) + '\x00').encode('utf8') if len(strings) else b''
     return encode_bytes(pid, raw)
 
 
-def encode_bytes(pid: int, payload: bytes) -> bytes:
+_U32 = struct.Struct("<I")
+
+
+def encode_strings_dict(pid: int, strings: List[str]) -> bytes:
+    """
+    Dictionary-encode *strings*, which in OSM are highly repetitive:
+    ``<uint32 n_unique>``, the distinct strings NUL-terminated in order of
+    first appearance, ``<uint32 n>``, then n × ``<uint32 table index>``.
+    """
+    codes, uniques = pd.factorize(np.asarray(strings, dtype=object))
+    table = ('\x00'.join(uniques) + '\x00').encode('utf8') if len(uniques) else b''
+    raw = b''.join([
+        _U32.pack(len(uniques)),
+        table,
+        _U32.pack(len(codes)),
+        codes.astype('<u4').tobytes(),
+    ])
+    return encode_bytes(pid, raw)
+
+
+def encode_bytes(pid: int, payload: bytes, aux: int = 0) -> bytes:
     # Return header + raw payload (no Huffman compression)
-    return _hdr(pid, payload) + payload
+    return _hdr(pid, payload, aux) + payload
+
+
+# Road record layout: <uint32 way_id><uint16 n_coords> followed by
+# n_coords × <int32 x*1e6><int32 y*1e6>
+_ROAD_HDR_DTYPE = np.dtype([("way_id", "<u4"), ("n", "<u2")])
+_ROAD_COORD_SIZE = 8
+
+
+def road_record_offsets(counts: np.ndarray) -> np.ndarray:
+    """
+    Byte offset of each road record inside the CARTO payload, given the
+    number of vertices of every road (one preallocated cumsum).
+    """
+    sizes = _ROAD_HDR_DTYPE.itemsize + _ROAD_COORD_SIZE * np.asarray(counts, dtype=np.int64)
+    offsets = np.zeros(len(sizes), dtype=np.int64)
+    np.cumsum(sizes[:-1], out=offsets[1:])
+    return offsets
+
+
+def _pack_road_records(way_ids, counts: np.ndarray, coords: np.ndarray) -> bytes:
+    """
+    Pack road records from flat arrays: *counts[i]* vertices of road *i* are
+    stored consecutively in *coords* (shape ``(sum(counts), 2)``).
+    """
+    counts = np.asarray(counts, dtype=np.intp)
+    way_ids = np.asarray(way_ids, dtype=np.int64)
+    # The header fields are u4/u2; casting would silently wrap larger values
+    # and desynchronise every later record from road_record_offsets.
+    if len(counts) and (way_ids.min() < 0 or way_ids.max() > 0xFFFFFFFF):
+        raise ValueError("way ID does not fit the uint32 road record header")
+    if len(counts) and (counts.min() < 0 or counts.max() > 0xFFFF):
+        raise ValueError("road has more vertices than the uint16 record header allows")
+    hdr = np.empty(len(counts), dtype=_ROAD_HDR_DTYPE)
+    hdr["way_id"] = way_ids
+    hdr["n"] = counts
+    ints = np.empty((len(coords), 2), dtype="<i4")
+    ints[...] = np.asarray(coords, dtype=np.float64).reshape(-1, 2) * 1e6
+
+    starts = road_record_offsets(counts)
+    total = _ROAD_HDR_DTYPE.itemsize * len(counts) + _ROAD_COORD_SIZE * len(ints)
+
+    # Coordinate blocks are already contiguous in road order, so everything
+    # that is not a header byte is simply the int32 buffer in sequence.
+    out = np.empty(total, dtype=np.uint8)
+    is_hdr = np.zeros(len(out), dtype=bool)
+    is_hdr[(starts[:, None] + np.arange(_ROAD_HDR_DTYPE.itemsize)).ravel()] = True
+    out[is_hdr] = hdr.view(np.uint8)
+    out[~is_hdr] = ints.view(np.uint8).ravel()
+    return out.tobytes()
 
 
 def encode_road_records(
     pid: int,
     records: List[Tuple[int, List[Tuple[float, float]]]]
 ) -> bytes:
-    buf = io.BytesIO()
-    for way_id, coords in records:
-        buf.write(struct.pack('<IH', way_id, len(coords)))
-        for x, y in coords:
-            buf.write(struct.pack('<ii', int(x * 1e6), int(y * 1e6)))
-    return encode_bytes(pid, buf.getvalue())
+    way_ids = [way_id for way_id, _ in records]
+    counts = np.array([len(coords) for _, coords in records], dtype=np.intp)
+    if counts.sum():
+        coords = np.concatenate(
+            [np.asarray(c, dtype=np.float64).reshape(-1, 2) for _, c in records]
+        )
+    else:
+        coords = np.empty((0, 2), dtype=np.float64)
+    return encode_bytes(pid, _pack_road_records(way_ids, counts, coords))
+
+
+def encode_road_arrays(
+    pid: int,
+    way_ids: np.ndarray,
+    counts: np.ndarray,
+    coords: np.ndarray,
+) -> bytes:
+    """Encode road records given as flat arrays (see ``_pack_road_records``)."""
+    return encode_bytes(pid, _pack_road_records(way_ids, counts, coords))
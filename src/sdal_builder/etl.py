@@ -13,15 +13,26 @@
 # blow up memory.  All downstream code continues to receive the same
 # GeoDataFrame formats as before.
 #
+# When *pyogrio* is available the parsed road network is cached next to the
+# PBF as a GeoPackage, so repeated builds skip PBF parsing entirely.
+#
 from __future__ import annotations
 
+import pathlib
 from typing import List, Optional
 
 import geopandas as gpd
-from shapely.geometry import Point
+import numpy as np
+import shapely
 
+from ._atomic import atomic_path
 from .sdal_osmium_stream import extract_driving_roads, extract_pois
 
+try:
+    import pyogrio
+except ImportError:
+    pyogrio = None
+
 
 # --------------------------------------------------------------------------- #
 # Road network                                                                #
@@ -33,8 +44,23 @@ def load_road_network(pbf_path: str) -> gpd.GeoDataFrame:
     The schema (columns / CRS) matches what the old Pyrosm-based implementation
     produced: ``id``, ``name``, ``highway``, ``oneway``, and ``geometry``
     (EPSG:4326).
+
+    With *pyogrio* installed, the result is cached as ``<pbf>.roads.gpkg``
+    and reused for as long as it is newer than the PBF.
     """
-    return extract_driving_roads(pbf_path)
+    if pyogrio is None:
+        return extract_driving_roads(pbf_path)
+
+    pbf = pathlib.Path(pbf_path)
+    cache = pbf.with_name(pbf.name + ".roads.gpkg")
+    if cache.exists() and cache.stat().st_mtime >= pbf.stat().st_mtime:
+        return pyogrio.read_dataframe(cache)
+
+    roads = extract_driving_roads(pbf_path)
+    if not roads.empty:
+        with atomic_path(cache) as tmp:
+            pyogrio.write_dataframe(roads, tmp, driver="GPKG")
+    return roads
 
 
 # --------------------------------------------------------------------------- #
@@ -92,8 +118,11 @@ def load_poi_data(
     poi = poi[ordered_cols].copy()
 
     # Convert any non-point geometries (e.g. polygon centroids) to centroids so
-    # the output remains consistent with historical behaviour.
-    if not poi.empty and not isinstance(poi.geometry.iloc[0], Point):
-        poi["geometry"] = poi.geometry.centroid
+    # the output remains consistent with historical behaviour.  Only those rows
+    # are touched; Points are left as they are.
+    geoms = np.asarray(poi.geometry.values)
+    not_point = shapely.get_type_id(geoms) != shapely.GeometryType.POINT
+    if not_point.any():
+        poi.loc[not_point, "geometry"] = shapely.centroid(geoms[not_point])
 
     return poi
@@ -1,20 +1,31 @@
 import pycdlib
 from datetime import datetime
+from io import BytesIO
 import pathlib
+from typing import Iterable, Tuple, Union
 
-def write_iso(files: list[pathlib.Path], out_path: pathlib.Path):
+def write_iso(
+    files: Iterable[Union[pathlib.Path, Tuple[str, bytes]]],
+    out_path: pathlib.Path,
+):
     """
     Build an ISO9660 Level 1 image with:
       - VOLID auto‑stamped as YYMMDD_HH (e.g. '250525_11')
-      - each file in `files` placed in the root with uppercase filename
+      - each entry in `files` placed in the root with uppercase filename;
+        an entry is either a path on disk or an in-memory ``(name, data)``
+        pair, which is added without a write-to-disk/re-read round trip
     """
     iso = pycdlib.PyCdlib()
     volid = datetime.now().strftime("%y%m%d_%H")
     iso.new(vol_ident=volid, interchange_level=3)
 
-    for fpath in files:
-        name = fpath.name.upper()
-        iso.add_file(str(fpath), f"/{name};1")
+    for entry in files:
+        if isinstance(entry, tuple):
+            name, data = entry
+            iso.add_fp(BytesIO(data), len(data), f"/{name.upper()};1")
+        else:
+            name = entry.name.upper()
+            iso.add_file(str(entry), f"/{name};1")
 
     iso.write(str(out_path))
     iso.close()
@@ -4,36 +4,68 @@ CLI for building SDAL ISO images per region, embedding PID 0 in MTOC.SDL,
 generating multi‐tile density overlays, and including all OSM POIs,
 all without blowing out memory by holding everything in a single GeoDataFrame.
 """
+from __future__ import annotations
+
 import argparse
 import logging
 import pathlib
 import sys
 import json
+import os
 import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from logging.handlers import RotatingFileHandler
 
 import requests
 import numpy as np
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import LineString, MultiLineString, box, Point
+import shapely
+from pyproj import Transformer
 from tqdm import tqdm
-import struct
 
 from .constants import (
     CARTO_PARCEL_ID,
     NAV_PARCEL_ID,
+    NAV_DICT_PARCEL_ID,
     KDTREE_PARCEL_ID,
     BTREE_PARCEL_ID,
     DENS_PARCEL_ID,
     POI_NAME_PARCEL_ID,
+    POI_NAME_DICT_PARCEL_ID,
     POI_GEOM_PARCEL_ID,
     POI_INDEX_PARCEL_ID,
 )
 from .etl import load_road_network, load_poi_data
-from .encoder import encode_strings, encode_road_records, encode_bytes
-from .spatial import build_kdtree, serialize_kdtree, build_bplustree, dump_bplustree
+from .encoder import (
+    encode_strings,
+    encode_strings_dict,
+    encode_road_arrays,
+    encode_bytes,
+    road_record_offsets,
+)
+from .spatial import (
+    build_flat_kdtree,
+    serialize_kdtree,
+    build_bplustree,
+    dump_bplustree,
+    build_offset_table,
+)
 from .iso import write_iso
+from ._density_kernel import rasterize
+from ._atomic import atomic_path
+
+DENS_GRID_SIZE = 256             # density overlay cells per tile side
+DENS_MAX_ZOOM = 3                # density tiles are built for zoom 0..DENS_MAX_ZOOM
+DENS_BITS_CHOICES = (8, 16)      # bits per density cell: log-scaled u8 or linear u16
+DENS_PIECE_UNITS = 256           # fixed-point density units per max-length piece
+
+DOWNLOAD_CHUNK = 1 << 20          # bytes read from the socket per iteration
+DOWNLOAD_PROGRESS_STEP = 16 << 20  # refresh the progress bar every N bytes
+DOWNLOAD_WORKERS = 4              # concurrent Geofabrik requests
+
+# Per-POI geometry payload: <int32 lat*1e6><int32 lon*1e6>
+_POI_GEOM_DTYPE = np.dtype([("lat", "<i4"), ("lon", "<i4")])
 
 
 def init_logging(verbose: bool, work_dir: pathlib.Path):
@@ -52,15 +84,297 @@ def init_logging(verbose: bool, work_dir: pathlib.Path):
     logging.getLogger().addHandler(fh)
 
 
-def _iter_coords(geom):
-    if isinstance(geom, LineString):
-        return list(geom.coords)
-    if isinstance(geom, MultiLineString):
-        coords = []
-        for part in geom.geoms:
-            coords.extend(part.coords)
-        return coords
-    return []
+def _road_pieces(geoms: np.ndarray, max_seg_length: float) -> np.ndarray:
+    """
+    Split the LineStrings *geoms* into straight pieces no longer than *max_seg_length* and
+    return them as an ``(N, 3)`` array of ``mid_x, mid_y, length`` rows.
+
+    The split is done once, in GEOS (``shapely.segmentize``), and the
+    pieces are then built from one flat coordinate extraction.
+    """
+    dense = shapely.segmentize(geoms, max_seg_length)
+    coords, index = shapely.get_coordinates(dense, return_index=True)
+    # Consecutive vertices form a piece only when they belong to the same part
+    same_part = index[1:] == index[:-1]
+    start = coords[:-1][same_part]
+    end = coords[1:][same_part]
+    lengths = np.hypot(end[:, 0] - start[:, 0], end[:, 1] - start[:, 1])
+    return np.column_stack([0.5 * (start + end), lengths])
+
+
+def _rasterize_density(
+    pieces: np.ndarray,
+    tminx: float,
+    tminy: float,
+    dx: float,
+    dy: float,
+    grid_size: int,
+    max_seg_length: float,
+) -> np.ndarray:
+    """
+    Accumulate road length per cell of a ``grid_size`` × ``grid_size`` grid.
+
+    Every piece (see ``_road_pieces``) credits its length to the cell
+    containing its midpoint; pieces falling outside the grid are dropped.
+    Lengths are accumulated as uint32 fixed-point values, with
+    ``DENS_PIECE_UNITS`` units per *max_seg_length*.
+    """
+    density = np.zeros((grid_size, grid_size), dtype=np.uint32)
+    rasterize(
+        pieces[:, 0], pieces[:, 1], pieces[:, 2],
+        tminx, tminy, 1.0 / dx, 1.0 / dy,
+        DENS_PIECE_UNITS / max_seg_length, density,
+    )
+    return density
+
+
+def _quadkey(tx, ty, zoom: int):
+    """Interleave the bits of tile column *tx* and row *ty* (Morton order)."""
+    key = tx * 0
+    for bit in range(zoom):
+        key |= ((tx >> bit) & 1) << (2 * bit) | ((ty >> bit) & 1) << (2 * bit + 1)
+    return key
+
+
+def _sort_pieces_by_tile(
+    pieces: np.ndarray, bounds: tuple[float, float, float, float]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sort *pieces* by the quadkey of the ``DENS_MAX_ZOOM`` tile holding their
+    midpoint and return ``(sorted_pieces, sorted_quadkeys)``.
+
+    In quadkey order every tile of every coarser zoom is a contiguous run as
+    well, so each tile's pieces are found with two binary searches.
+    """
+    minx, miny, maxx, maxy = bounds
+    n = 2 ** DENS_MAX_ZOOM
+    tx = np.clip(np.floor((pieces[:, 0] - minx) / (maxx - minx) * n), 0, n - 1).astype(np.int64)
+    ty = np.clip(np.floor((pieces[:, 1] - miny) / (maxy - miny) * n), 0, n - 1).astype(np.int64)
+    keys = _quadkey(tx, ty, DENS_MAX_ZOOM)
+    order = np.argsort(keys, kind="stable")
+    return pieces[order], keys[order]
+
+
+def _density_pieces(
+    roads_path: pathlib.Path, cache: pathlib.Path, pbf: pathlib.Path
+) -> tuple[pathlib.Path, np.ndarray, tuple[float, float, float, float], float]:
+    """
+    Return ``(pieces_path, piece_keys, proj_bounds, max_seg_length)`` for
+    the region whose roads were spilled to *roads_path*: the roads projected
+    to their local UTM zone, split by ``_road_pieces`` and sorted by
+    ``_sort_pieces_by_tile``.
+
+    Projection and splitting are the expensive part of the density step, so
+    the result is cached in *cache* (``.npz``) and reused for as long as it
+    is newer than the region's *pbf* and was built with the same grid. The
+    pieces themselves go to a ``.npy`` beside it (*pieces_path*) so the tile
+    workers can memory-map them instead of each receiving a copy.
+    """
+    grid = np.array([DENS_GRID_SIZE, DENS_MAX_ZOOM])
+    pieces_path = cache.with_suffix(".npy")
+    if (
+        cache.exists()
+        and pieces_path.exists()
+        and cache.stat().st_mtime >= pbf.stat().st_mtime
+    ):
+        with np.load(cache) as npz:
+            if np.array_equal(npz["grid"], grid):
+                bounds = tuple(float(v) for v in npz["bounds"])
+                return pieces_path, npz["piece_keys"], bounds, float(npz["max_seg_length"])
+
+    roads_df = pd.read_pickle(roads_path)
+
+    # No usable cache: project the spilled roads into a local UTM CRS for
+    # accurate length
+    bbox = roads_df.total_bounds  # [minx, miny, maxx, maxy] in EPSG:4326
+    minx, miny, maxx, maxy = bbox
+    center_x = (minx + maxx) / 2.0
+    center_y = (miny + maxy) / 2.0
+    utm_zone = int((center_x + 180) / 6) + 1
+    utm_crs = f"EPSG:{32600 + utm_zone}"
+
+    # Reproject the flat coordinate buffer in one pyproj call rather than
+    # going through GeoDataFrame.to_crs (no per-row metadata/copies).
+    to_utm = Transformer.from_crs("EPSG:4326", utm_crs, always_xy=True)
+    roads_proj = shapely.transform(
+        roads_df.geometry.values,
+        lambda xy: np.column_stack(to_utm.transform(xy[:, 0], xy[:, 1])),
+    )
+    proj_bounds = shapely.total_bounds(roads_proj)  # [pminx, pminy, pmaxx, pmaxy] in meters
+    pminx, pminy, pmaxx, pmaxy = (float(v) for v in proj_bounds)
+
+    # get_parts splits multi-part geometries, so only LineStrings remain to keep
+    roads_simple = shapely.get_parts(roads_proj)
+    roads_simple = roads_simple[
+        shapely.get_type_id(roads_simple) == shapely.GeometryType.LINESTRING
+    ]
+
+    # Split the projected roads once into pieces no longer than half a
+    # cell of the finest zoom, so no tile needs to subdivide again. With
+    # the pieces in quadkey order, each tile is a contiguous slice.
+    finest_cell = min(pmaxx - pminx, pmaxy - pminy) / 2 ** DENS_MAX_ZOOM / DENS_GRID_SIZE
+    max_seg_length = finest_cell / 2.0
+    bounds = (pminx, pminy, pmaxx, pmaxy)
+    pieces, piece_keys = _sort_pieces_by_tile(_road_pieces(roads_simple, max_seg_length), bounds)
+
+    # The .npz goes last: it is what marks the pair as a valid cache
+    with atomic_path(pieces_path) as tmp:
+        np.save(tmp, pieces)
+    with atomic_path(cache) as tmp:
+        np.savez(
+            tmp,
+            grid=grid,
+            bounds=np.array(bounds),
+            max_seg_length=max_seg_length,
+            piece_keys=piece_keys,
+        )
+    return pieces_path, piece_keys, bounds, max_seg_length
+
+
+# Per-process state of the density tile pool (see _init_tile_worker)
+_tile_pieces: np.ndarray | None = None
+_tile_max_seg_length: float = 0.0
+_tile_dens_bits: int = 8
+
+
+def _init_tile_worker(pieces_path: pathlib.Path, max_seg_length: float, dens_bits: int) -> None:
+    """
+    Pool initializer: memory-map the region's tile-sorted road pieces, so
+    workers share the page cache rather than each holding a pickled copy.
+    """
+    global _tile_pieces, _tile_max_seg_length, _tile_dens_bits
+    _tile_pieces = np.load(pieces_path, mmap_mode="r")
+    _tile_max_seg_length = max_seg_length
+    _tile_dens_bits = dens_bits
+
+
+def _rasterize_tile(task: tuple[int, int, tuple[float, float, float, float]]) -> bytes:
+    """
+    Rasterize one density tile — the pieces in ``_tile_pieces[start:stop]``
+    over *bounds* — and return its cells scaled so that the densest cell of
+    the tile is the largest value: log-scaled uint8 cells when
+    ``_tile_dens_bits`` is 8, linear little-endian uint16 cells when it is 16.
+    """
+    start, stop, (tminx, tminy, tmaxx, tmaxy) = task
+    empty = bytes(DENS_GRID_SIZE * DENS_GRID_SIZE * _tile_dens_bits // 8)
+    if start == stop:
+        return empty
+
+    dx = (tmaxx - tminx) / DENS_GRID_SIZE
+    dy = (tmaxy - tminy) / DENS_GRID_SIZE
+    density_array = _rasterize_density(
+        _tile_pieces[start:stop], tminx, tminy, dx, dy, DENS_GRID_SIZE, _tile_max_seg_length
+    )
+
+    max_val = int(density_array.max())
+    if max_val == 0:
+        return empty
+    if _tile_dens_bits == 8:
+        # Log scale keeps sparse rural roads visible next to dense city cores
+        density_scaled = np.rint(np.log1p(density_array) * (255 / np.log1p(max_val)))
+        return density_scaled.astype(np.uint8).tobytes()
+    density_scaled = density_array.astype(np.uint64) * 65535 // max_val
+    return density_scaled.astype("<u2").tobytes()
+
+
+def _offset_index(
+    pid: int,
+    keys: np.ndarray,
+    offsets: np.ndarray,
+    bpt_path: pathlib.Path,
+    use_bplustree: bool,
+) -> bytes:
+    """
+    Return the encoded *pid* index parcel mapping *keys* ➜ *offsets*: a
+    sorted offset table by default, or a legacy B+-tree file built at
+    *bpt_path*.
+    """
+    if use_bplustree:
+        build_bplustree(zip(keys.tolist(), offsets.tolist()), str(bpt_path))
+        # The mapping is only read while the parcel is assembled
+        with dump_bplustree(str(bpt_path)) as tree:
+            return encode_bytes(pid, tree)
+    return encode_bytes(pid, build_offset_table(keys, offsets))
+
+
+def _encode_names(
+    names: list[str], plain_pid: int, dict_pid: int, plain_names: bool
+) -> bytes:
+    """
+    Encode a name parcel: dictionary-encoded under *dict_pid* by default, or
+    as the legacy NUL-terminated list under *plain_pid*.
+    """
+    if plain_names:
+        return encode_strings(plain_pid, names)
+    return encode_strings_dict(dict_pid, names)
+
+
+def _load_region_roads(
+    pbf: pathlib.Path, roads_path: pathlib.Path
+) -> tuple[int, np.ndarray]:
+    """
+    Region worker: parse the roads of *pbf*, spill the ``id``, ``name`` and
+    ``geometry`` columns to *roads_path*, and return the road count and the
+    ``(N, 2)`` road centroids for the global KD-tree.
+    """
+    roads_df = load_road_network(str(pbf))
+    roads_df[["id", "name", "geometry"]].to_pickle(roads_path)
+    centroids = shapely.get_coordinates(shapely.centroid(roads_df.geometry.values))
+    return len(roads_df), centroids
+
+
+def _load_region_pois(pbf: pathlib.Path) -> tuple[list[str], bytes]:
+    """
+    Region worker: parse the POIs of *pbf* and return their names and their
+    packed ``_POI_GEOM_DTYPE`` (lat/lon in i32) payload.
+    """
+    pois_df = load_poi_data(str(pbf), poi_tags=None)
+    # load_poi_data already reduced every geometry to a Point.
+    geoms = pois_df.geometry.values
+    packed = np.empty(len(geoms), dtype=_POI_GEOM_DTYPE)
+    packed["lat"] = shapely.get_y(geoms) * 1e6
+    packed["lon"] = shapely.get_x(geoms) * 1e6
+    return pois_df["name"].fillna("").tolist(), packed.tobytes()
+
+
+def _write_region_sdls(
+    roads_path: pathlib.Path,
+    stem: str,
+    work: pathlib.Path,
+    use_bplustree: bool,
+    plain_names: bool,
+) -> tuple[pathlib.Path, pathlib.Path]:
+    """
+    Region worker: write the FAST (road names + way index) and MAP (road
+    records) SDLs for the roads spilled at *roads_path*.  The caller appends
+    the shared KD-tree parcel to the MAP file.
+    """
+    roads_df = pd.read_pickle(roads_path)
+
+    # FAST file: all 'name' strings for roads in this region, then the way index
+    fast = work / f"{stem}F.SDL"
+    # Fill None → "" to avoid encode errors
+    names = roads_df["name"].fillna("").tolist()
+
+    # All vertices in one (N, 2) array; `vertex_road[k]` is the row of vertex k
+    way_ids = roads_df["id"].to_numpy()
+    coords, vertex_road = shapely.get_coordinates(roads_df.geometry.values, return_index=True)
+    counts = np.bincount(vertex_road, minlength=len(roads_df))
+
+    offsets = road_record_offsets(counts)
+    bt_parcel = _offset_index(
+        BTREE_PARCEL_ID, way_ids, offsets, work / f"{stem}.bpt", use_bplustree
+    )
+    # One open per file (a second write_bytes() would truncate the first
+    # parcel); parcels are written back to back rather than concatenated first.
+    with open(fast, "wb") as f:
+        f.write(_encode_names(names, NAV_PARCEL_ID, NAV_DICT_PARCEL_ID, plain_names))
+        f.write(bt_parcel)
+
+    # MAP file: CARTO (road records); the KD-tree parcel follows
+    mapf = work / f"{stem}M.SDL"
+    mapf.write_bytes(encode_road_arrays(CARTO_PARCEL_ID, way_ids, counts, coords))
+    return fast, mapf
 
 
 def fetch(region: str, dest: pathlib.Path) -> pathlib.Path:
@@ -77,10 +391,17 @@ def fetch(region: str, dest: pathlib.Path) -> pathlib.Path:
     r = requests.get(url, stream=True, timeout=30)
     r.raise_for_status()
     total = int(r.headers.get("content-length", 0))
-    with open(dest, "wb") as f, tqdm(total=total, unit="B", unit_scale=True) as bar:
-        for chunk in r.iter_content(8192):
+    with atomic_path(dest) as tmp, open(tmp, "wb") as f, tqdm(
+        total=total, unit="B", unit_scale=True, desc=dest.name
+    ) as bar:
+        pending = 0
+        for chunk in r.iter_content(DOWNLOAD_CHUNK):
             f.write(chunk)
-            bar.update(len(chunk))
+            pending += len(chunk)
+            if pending >= DOWNLOAD_PROGRESS_STEP:
+                bar.update(pending)
+                pending = 0
+        bar.update(pending)
 
     log.info("Saved %s (%.1f MB)", dest, dest.stat().st_size / 1e6)
     return dest
@@ -108,21 +429,26 @@ def build_manifest_payload(regions: list[str], filenames: list[str]) -> bytes:
     return json.dumps(manifest).encode("utf-8")
 
 
-def build(regions: list[str], out_iso: pathlib.Path, work: pathlib.Path):
+def build(
+    regions: list[str],
+    out_iso: pathlib.Path,
+    work: pathlib.Path,
+    jobs: int | None = None,
+    use_bplustree: bool = False,
+    plain_names: bool = False,
+    dens_bits: int = 8,
+):
     log = logging.getLogger(__name__)
+    jobs = jobs or os.cpu_count() or 1
 
-    # 0) Validate that each region slug exists:
-    for region in regions:
-        if not region_exists(region):
+    # 0) Validate that each region slug exists (HEAD requests run concurrently):
+    with ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, len(regions))) as pool:
+        exists = list(pool.map(region_exists, regions))
+    for region, ok in zip(regions, exists):
+        if not ok:
             log.error(f"Region slug '{region}' not found or not downloadable from Geofabrik.")
             sys.exit(1)
 
-    # Suppress Pyrosm’s chained-assignment FutureWarning
-    warnings.filterwarnings(
-        "ignore",
-        category=FutureWarning,
-        module="pyrosm.networks"
-    )
     # Suppress Shapely’s “geographic CRS” centroid warning
     warnings.filterwarnings(
         "ignore",
@@ -134,85 +460,85 @@ def build(regions: list[str], out_iso: pathlib.Path, work: pathlib.Path):
 
     try:
         # ────────────────────────────────────────────────────────────────────────
-        # 1) STREAM ROAD NETWORKS FROM EACH REGION, ONE-BY-ONE, COLLECT CENTROIDS ONLY
+        # 1) PARSE ROAD NETWORKS, ONE REGION PER WORKER, COLLECT CENTROIDS ONLY
         #    (so we never hold all geometries in one giant GeoDataFrame)
 
-        all_centroids: list[tuple[float, float]] = []
+        all_centroids: list[np.ndarray] = []
         region_road_counts: dict[str,int] = {}
+        region_roads: dict[str, pathlib.Path] = {}
 
         for region in regions:
-            pbf_path = work / f"{region.replace('/', '-')}.osm.pbf"
-            pbf = fetch(region, pbf_path)
-
-            log.info("Parsing road network for %s with Pyrosm", region)
-            roads_df = load_road_network(str(pbf))  # this returns a GeoDataFrame of roads
-            count = len(roads_df)
-            log.info("Loaded %d road geometries from %s", count, region)
-            region_road_counts[region] = count
-
-            # Extract centroids (x,y) for KD-tree; drop geometry immediately after
-            centroids = [(pt.x, pt.y) for pt in roads_df.geometry.centroid]
-            all_centroids.extend(centroids)
-
-            # We need nothing else from `roads_df` right now—drop it to free memory
-            del roads_df
+            # Step 1 spills the columns later steps need so the PBF is parsed
+            # only once; steps 5 and 6 reload this instead.
+            region_roads[region] = work / f"{region.replace('/', '-')}.roads.pkl"
+
+        # Downloads are network-bound: fetch all regions concurrently
+        with ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, len(regions))) as pool:
+            pbfs = list(pool.map(
+                fetch, regions, [work / f"{r.replace('/', '-')}.osm.pbf" for r in regions]
+            ))
+
+        # Regions are independent: parse them across a process pool
+        region_workers = min(jobs, len(regions))
+        log.info("Parsing road networks for %d region(s)", len(regions))
+        with ProcessPoolExecutor(max_workers=region_workers) as pool:
+            results = pool.map(_load_region_roads, pbfs, [region_roads[r] for r in regions])
+            for region, (count, centroids) in zip(regions, results):
+                log.info("Loaded %d road geometries from %s", count, region)
+                region_road_counts[region] = count
+                all_centroids.append(centroids)
 
         log.info("Total combined road geometries (sum of all regions): %d", sum(region_road_counts.values()))
 
         # 2) BUILD A SINGLE, GLOBAL KD-TREE OVER ALL CENTROIDS
         log.info("Building global KD-tree")
-        kd = build_kdtree(all_centroids)
-        kd_blob = serialize_kdtree(kd)
+        kd_blob = serialize_kdtree(build_flat_kdtree(np.concatenate(all_centroids)))
 
         # ────────────────────────────────────────────────────────────────────────
-        # 3) STREAM POIs FROM EACH REGION, ONE-BY-ONE, CONCATENATE NAMES & GEOMETRIES
+        # 3) PARSE POIs, ONE REGION PER WORKER, CONCATENATE NAMES & GEOMETRIES
         all_poi_names: list[str] = []
-        poi_records: list[tuple[int, bytes]] = []
-        poi_offsets: list[tuple[int,int]] = []
-        offset_acc = 0
+        poi_payloads: list[bytes] = []
 
-        poi_index_counter = 0
-        for region in regions:
-            pbf_path = work / f"{region.replace('/', '-')}.osm.pbf"
-            pois_df = load_poi_data(str(pbf_path), poi_tags=None)
-            log.info("Loaded %d POIs from %s", len(pois_df), region)
-
-            # 3.a) Collect `name` column into a single list of strings:
-            all_poi_names.extend(pois_df["name"].fillna("").tolist())
-
-            # 3.b) Build per-POI geometry payloads (lat/lon in u32) for B+ tree:
-            for geom_idx, geom in zip(pois_df.index, pois_df.geometry):
-                # If geometry is not a Point, use centroid:
-                if not isinstance(geom, Point):
-                    geom = geom.centroid
-                lon, lat = geom.x, geom.y
-                payload = struct.pack("<ii", int(lat * 1e6), int(lon * 1e6))
-                poi_records.append((int(poi_index_counter), payload))
-                poi_offsets.append((int(poi_index_counter), offset_acc))
-                offset_acc += len(payload) + 6  # +6 bytes reserved per-record if needed
-                poi_index_counter += 1
-
-            del pois_df
+        with ProcessPoolExecutor(max_workers=region_workers) as pool:
+            for region, (names, payload) in zip(regions, pool.map(_load_region_pois, pbfs)):
+                log.info("Loaded %d POIs from %s", len(names), region)
+
+                # 3.a) Collect `name` column into a single list of strings:
+                all_poi_names.extend(names)
+
+                # 3.b) Per-POI lat/lon records (i32) for the single POI_GEOM parcel
+                poi_payloads.append(payload)
 
         log.info("Total combined POIs: %d", len(all_poi_names))
 
         # 3.c) ENCODE POI NAMES → POINAMES.SDL
-        global_files: list[pathlib.Path] = []
+        # Large SDLs are written to `work` and streamed from disk by the ISO
+        # writer; small ones only exist to be packed, so they stay in memory
+        # as (name, bytes) entries.
+        global_files: list[pathlib.Path | tuple[str, bytes]] = []
         poi_name_file = work / "POINAMES.SDL"
-        poi_name_bytes = encode_strings(POI_NAME_PARCEL_ID, all_poi_names)
+        poi_name_bytes = _encode_names(
+            all_poi_names, POI_NAME_PARCEL_ID, POI_NAME_DICT_PARCEL_ID, plain_names
+        )
         poi_name_file.write_bytes(poi_name_bytes)
         global_files.append(poi_name_file)
 
-        # 3.d) BUILD B+ INDEX & DATA BLOB FOR POI GEOMETRIES → POIGEOM.SDL
-        poi_idx_path = work / "POI.bpt"
-        build_bplustree(poi_offsets, str(poi_idx_path))
-        poi_index_blob = dump_bplustree(str(poi_idx_path))
+        # 3.d) BUILD POI GEOMETRY INDEX (offset table, or --bplustree) & DATA BLOB → POIGEOM.SDL
+        # Every POI record has the same size, so POI i sits at i × itemsize
+        # from the start of the single POI_GEOM parcel payload.
+        poi_ids = np.arange(len(all_poi_names), dtype=np.uint64)
+        poi_index_parcel = _offset_index(
+            POI_INDEX_PARCEL_ID,
+            poi_ids,
+            poi_ids * _POI_GEOM_DTYPE.itemsize,
+            work / "POI.bpt",
+            use_bplustree,
+        )
 
         poi_geom_file = work / "POIGEOM.SDL"
         with open(poi_geom_file, "wb") as f:
-            for pid, payload in poi_records:
-                f.write(encode_bytes(POI_GEOM_PARCEL_ID, payload))
-            f.write(encode_bytes(POI_INDEX_PARCEL_ID, poi_index_blob))
+            f.write(encode_bytes(POI_GEOM_PARCEL_ID, b"".join(poi_payloads)))
+            f.write(poi_index_parcel)
         global_files.append(poi_geom_file)
 
         # ────────────────────────────────────────────────────────────────────────
@@ -228,20 +554,18 @@ def build(regions: list[str], out_iso: pathlib.Path, work: pathlib.Path):
             stem = pathlib.Path(region).name.upper().replace("-", "_")
             filenames.extend([f"{stem}F.SDL", f"{stem}M.SDL"])
 
-        mtoc = work / "MTOC.SDL"
         manifest = build_manifest_payload(regions, filenames)
-        mtoc.write_bytes(encode_bytes(0, manifest))
-        global_files.append(mtoc)
+        global_files.append(("MTOC.SDL", encode_bytes(0, manifest)))
 
         for name, pid, data in [
             ("CARTOTOP.SDL", CARTO_PARCEL_ID, b""),
             ("REGION.SDL", NAV_PARCEL_ID, b""),
             ("REGIONS.SDL", BTREE_PARCEL_ID, b""),
-            ("KDTREE.SDL", KDTREE_PARCEL_ID, kd_blob),
         ]:
-            path = work / name
-            path.write_bytes(encode_bytes(pid, data))
-            global_files.append(path)
+            global_files.append((name, encode_bytes(pid, data)))
+        # The same KD-tree parcel also ends every region's MAP file: encode it once
+        kd_parcel = encode_bytes(KDTREE_PARCEL_ID, kd_blob)
+        global_files.append(("KDTREE.SDL", kd_parcel))
 
         # ────────────────────────────────────────────────────────────────────────
         # 5) MULTI-TILE DENSITY OVERLAY, REGION-BY-REGION (never keep all roads in memory)
@@ -249,34 +573,23 @@ def build(regions: list[str], out_iso: pathlib.Path, work: pathlib.Path):
         # We already have `all_centroids` so we can drop it now if we want:
         del all_centroids
 
-        # But for density, we need the *geometries* of each region. We re-load, tile, and drop each region’s roads in turn.
+        # Density pieces come from each region's cached .dens.npz, or are cut
+        # from its .roads.pkl spill when that cache is missing or stale; only
+        # one region's pieces are held at a time.
         for region in regions:
-            pbf_path = work / f"{region.replace('/', '-')}.osm.pbf"
-            roads_df = load_road_network(str(pbf_path))  # local GeoDataFrame
-            log.info("Loaded %d road geometries for density from %s", len(roads_df), region)
-
-            # Project into a local UTM CRS for accurate length (same as earlier)
-            bbox = roads_df.total_bounds  # [minx, miny, maxx, maxy] in EPSG:4326
-            minx, miny, maxx, maxy = bbox
-            center_x = (minx + maxx) / 2.0
-            center_y = (miny + maxy) / 2.0
-            utm_zone = int((center_x + 180) / 6) + 1
-            utm_crs = f"EPSG:{32600 + utm_zone}"
-
-            roads_proj = roads_df.to_crs(utm_crs)
-            proj_bounds = roads_proj.total_bounds  # [pminx, pminy, pmaxx, pmaxy] in meters
-            pminx, pminy, pmaxx, pmaxy = proj_bounds
-
-            roads_simple = roads_proj.explode(ignore_index=True)
-            roads_simple = roads_simple[
-                roads_simple.geometry.type.isin(["LineString", "MultiLineString"])
-            ]
+            slug = region.replace('/', '-')
+            pieces_path, piece_keys, (pminx, pminy, pmaxx, pmaxy), max_seg_length = _density_pieces(
+                region_roads[region], work / f"{slug}.dens.npz", work / f"{slug}.osm.pbf"
+            )
+            log.info("Prepared %d density pieces for %s", len(piece_keys), region)
 
             # For zoom levels 0..3, build 1, 4, 16, and 64 tiles respectively for this one region:
-            for Z in range(0, 4):
+            tiles = []
+            for Z in range(0, DENS_MAX_ZOOM + 1):
                 num_tiles = 2 ** Z
                 tile_width = (pmaxx - pminx) / num_tiles
                 tile_height = (pmaxy - pminy) / num_tiles
+                shift = 2 * (DENS_MAX_ZOOM - Z)
 
                 for tx in range(num_tiles):
                     for ty in range(num_tiles):
@@ -284,58 +597,30 @@ def build(regions: list[str], out_iso: pathlib.Path, work: pathlib.Path):
                         tmaxx = pminx + (tx + 1) * tile_width
                         tminy = pminy + ty * tile_height
                         tmaxy = pminy + (ty + 1) * tile_height
-
-                        grid_size = 256
-                        dx = (tmaxx - tminx) / grid_size
-                        dy = (tmaxy - tminy) / grid_size
-
-                        density_array = np.zeros((grid_size, grid_size), dtype=np.float64)
-                        tile_box = box(tminx, tminy, tmaxx, tmaxy)
-                        clipped = roads_simple.geometry.intersection(tile_box)
-
-                        max_seg_length = min(dx, dy) / 2.0
-                        for seg_geom in tqdm(
-                            clipped,
-                            desc=f"Rasterizing {region} Z{Z} tile ({tx},{ty})",
-                            leave=False,
-                        ):
-                            if seg_geom.is_empty:
-                                continue
-                            total_len = seg_geom.length
-                            if total_len == 0:
-                                continue
-
-                            n_pieces = max(1, int(np.ceil(total_len / max_seg_length)))
-                            fractions = np.linspace(0, 1, n_pieces + 1)
-                            prev_pt = seg_geom.interpolate(fractions[0], normalized=True)
-                            for i in range(1, len(fractions)):
-                                curr_pt = seg_geom.interpolate(fractions[i], normalized=True)
-                                seg_len = prev_pt.distance(curr_pt)
-                                midpoint = LineString([prev_pt, curr_pt]).centroid
-                                mx, my = midpoint.x, midpoint.y
-
-                                col = int((mx - tminx) // dx)
-                                row = int((my - tminy) // dy)
-                                if 0 <= col < grid_size and 0 <= row < grid_size:
-                                    density_array[row, col] += seg_len
-                                prev_pt = curr_pt
-
-                        max_val = density_array.max()
-                        scale = 65535.0 / max_val if max_val > 0 else 0.0
-                        density_scaled = (
-                            (density_array * scale).clip(0, 65535).astype(np.uint16)
-                        )
-                        raw_bytes = density_scaled.astype("<u2").tobytes()
-
-                        code = pathlib.Path(region).name.upper().replace("-", "_")[:2]
-                        tile_id = ty * num_tiles + tx
-                        dens_filename = f"DENS{code}{Z}{tile_id}.SDL"
-                        dens_path = work / dens_filename
-                        dens_path.write_bytes(encode_bytes(DENS_PARCEL_ID, raw_bytes))
-                        global_files.append(dens_path)
+                        key = _quadkey(tx, ty, Z)
+                        start, stop = np.searchsorted(piece_keys, [key << shift, (key + 1) << shift])
+                        tiles.append((Z, tx, ty, (int(start), int(stop), (tminx, tminy, tmaxx, tmaxy))))
+
+            # Tiles are independent, so they are rasterized across a process
+            # pool whose workers map the cached piece array at start-up.
+            code = pathlib.Path(region).name.upper().replace("-", "_")[:2]
+            with ProcessPoolExecutor(
+                max_workers=min(jobs, len(tiles)),
+                initializer=_init_tile_worker,
+                initargs=(pieces_path, max_seg_length, dens_bits),
+            ) as pool:
+                results = pool.map(_rasterize_tile, [task for *_, task in tiles])
+                for (Z, tx, ty, _), raw_bytes in zip(tiles, results):
+                    log.debug("Rasterized %s Z%d tile (%d,%d)", region, Z, tx, ty)
+                    tile_id = ty * 2 ** Z + tx
+                    dens_filename = f"DENS{code}{Z}{tile_id}.SDL"
+                    # The header's aux byte tells decoders the bits per cell
+                    global_files.append(
+                        (dens_filename, encode_bytes(DENS_PARCEL_ID, raw_bytes, aux=dens_bits))
+                    )
 
             # Done with this region’s roads for density—drop to free memory
-            del roads_df, roads_proj, roads_simple
+            del piece_keys
 
         # ────────────────────────────────────────────────────────────────────────
         # 6) BUILD PER-REGION FAST & MAP SDLs (roads only, streaming names & coords)
@@ -343,42 +628,21 @@ def build(regions: list[str], out_iso: pathlib.Path, work: pathlib.Path):
         region_files: list[pathlib.Path] = []
         poi_name_offset = 0  # not strictly needed, but we maintain consistent indexing
 
-        for region in regions:
-            # Re-load *just* the road names (and ids) for this region—drop geometry right away.
-            pbf_path = work / f"{region.replace('/', '-')}.osm.pbf"
-            roads_df = load_road_network(str(pbf_path))[["id", "name", "geometry"]]
-
-            stem = pathlib.Path(region).name.upper().replace("-", "_")
-
-            # 6.a) FAST file: write out all 'name' strings for roads in this region, then B+ index
-            fast = work / f"{stem}F.SDL"
-            # Fill None → "" to avoid encode errors
-            names = roads_df["name"].fillna("").tolist()
-            fast.write_bytes(encode_strings(NAV_PARCEL_ID, names))
-
-            records = []
-            offsets = []
-            off = 0
-            for wid, geom in tqdm(zip(roads_df["id"], roads_df.geometry), total=len(roads_df), unit="road"):
-                coords = _iter_coords(geom)
-                records.append((wid, coords))
-                size = 6 + len(coords) * 16
-                offsets.append((wid, off))
-                off += size
-
-            idx_path = work / f"{stem}.bpt"
-            build_bplustree(offsets, str(idx_path))
-            bt_blob = dump_bplustree(str(idx_path))
-            fast.write_bytes(encode_bytes(BTREE_PARCEL_ID, bt_blob))
-            region_files.append(fast)
-
-            # 6.b) MAP file: CARTO (road records) + KD-tree
-            mapf = work / f"{stem}M.SDL"
-            mapf.write_bytes(encode_road_records(CARTO_PARCEL_ID, records))
-            mapf.write_bytes(encode_bytes(KDTREE_PARCEL_ID, kd_blob))
-            region_files.append(mapf)
-
-            del roads_df  # drop for memory
+        stems = [pathlib.Path(region).name.upper().replace("-", "_") for region in regions]
+        with ProcessPoolExecutor(max_workers=region_workers) as pool:
+            results = pool.map(
+                _write_region_sdls,
+                [region_roads[region] for region in regions],
+                stems,
+                [work] * len(regions),
+                [use_bplustree] * len(regions),
+                [plain_names] * len(regions),
+            )
+            for fast, mapf in results:
+                # 6.b) MAP file: CARTO (road records) + KD-tree
+                with open(mapf, "ab") as f:
+                    f.write(kd_parcel)
+                region_files.extend([fast, mapf])
 
         # ────────────────────────────────────────────────────────────────────────
         # 7) MASTER THE ISO
@@ -399,10 +663,42 @@ def cli():
     )
     parser.add_argument("--out", default="sdal.iso", help="Output ISO path")
     parser.add_argument("--work", default="build/tmp", help="Working directory")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes for region parsing and density rasterization (default: CPU count)",
+    )
+    parser.add_argument(
+        "--bplustree",
+        action="store_true",
+        help="Write way/POI indexes as legacy B+-tree files instead of sorted offset tables",
+    )
+    parser.add_argument(
+        "--plain-names",
+        action="store_true",
+        help="Write road/POI names as legacy NUL-terminated lists instead of dictionary-encoded",
+    )
+    parser.add_argument(
+        "--dens-bits",
+        type=int,
+        choices=DENS_BITS_CHOICES,
+        default=8,
+        help="Bits per density cell: 8 = log-scaled uint8, 16 = linear uint16 (default: 8)",
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose logging")
     args = parser.parse_args()
     init_logging(args.verbose, pathlib.Path(args.work))
-    build(args.regions, pathlib.Path(args.out), pathlib.Path(args.work))
+    build(
+        args.regions,
+        pathlib.Path(args.out),
+        pathlib.Path(args.work),
+        jobs=args.jobs,
+        use_bplustree=args.bplustree,
+        plain_names=args.plain_names,
+        dens_bits=args.dens_bits,
+    )
 
 
 if __name__ == "__main__":
@@ -10,10 +10,13 @@ from __future__ import annotations
 
 import logging
 import time
+from array import array
 from typing import Dict, List, Optional
 
 import geopandas as gpd
+import numpy as np
 import osmium
+import shapely
 import shapely.geometry as sg
 from shapely.geometry import Point
 
@@ -53,9 +56,26 @@ _DRIVABLE = {
 
 
 class _RoadHandler(_ProgressHandler):
+    # One column per attribute (struct-of-arrays) rather than a dict per way:
+    # no per-row dict, and the GeoDataFrame is built straight from columns.
+    # Vertices go into one flat lon/lat buffer (``sizes`` vertices per way) so
+    # all LineStrings are created afterwards in a single shapely call.
     def __init__(self) -> None:
         super().__init__("_RoadHandler")
-        self.rows: List[Dict] = []
+        self.ids = array("q")
+        self.names: List[str] = []
+        self.highways: List[str] = []
+        self.oneways: List[str] = []
+        self.xy = array("d")
+        self.sizes = array("q")
+
+    def geometries(self) -> np.ndarray:
+        """Build every parsed way's LineString from the flat vertex buffer."""
+        coords = np.frombuffer(self.xy, dtype=np.float64).reshape(-1, 2)
+        if not len(coords):
+            return np.empty(0, dtype=object)
+        indices = np.repeat(np.arange(len(self.sizes)), np.frombuffer(self.sizes, dtype=np.int64))
+        return shapely.linestrings(coords, indices=indices)
 
     def way(self, w: osmium.osm.Way) -> None:  # type: ignore[attr-defined]
         # Count every way processed for progress
@@ -66,20 +86,17 @@ class _RoadHandler(_ProgressHandler):
             return
 
         try:
-            coords = [(n.lon, n.lat) for n in w.nodes]
+            coords = [c for n in w.nodes for c in (n.lon, n.lat)]
         except osmium._osmium.InvalidLocationError:
             # If any node lacks a valid location, skip this way entirely
             return
 
-        self.rows.append(
-            {
-                "id": int(w.id),
-                "name": w.tags.get("name", ""),
-                "highway": w.tags.get("highway", ""),
-                "oneway": w.tags.get("oneway", ""),
-                "geometry": sg.LineString(coords),
-            }
-        )
+        self.ids.append(w.id)
+        self.names.append(w.tags.get("name", ""))
+        self.highways.append(w.tags.get("highway", ""))
+        self.oneways.append(w.tags.get("oneway", ""))
+        self.xy.extend(coords)
+        self.sizes.append(len(coords) // 2)
 
 
 def extract_driving_roads(pbf_path: str) -> gpd.GeoDataFrame:
@@ -93,10 +110,18 @@ def extract_driving_roads(pbf_path: str) -> gpd.GeoDataFrame:
     handler.apply_file(pbf_path, locations=True, idx="flex_mem")
     LOG.info(
         "Road parsing done: %d features, %.1fs total",
-        len(handler.rows),
+        len(handler.ids),
         time.time() - handler._start,
     )
-    return gpd.GeoDataFrame(handler.rows, geometry="geometry", crs="EPSG:4326")
+    return gpd.GeoDataFrame(
+        {
+            "id": np.frombuffer(handler.ids, dtype=np.int64),
+            "name": handler.names,
+            "highway": handler.highways,
+            "oneway": handler.oneways,
+        },
+        geometry=gpd.GeoSeries(handler.geometries(), crs="EPSG:4326"),
+    )
 
 
 # --------------------------------------------------------------------------- #
@@ -1,8 +1,9 @@
 """
 Spatial helpers for SDAL builder
 ———————————————
-• KD-tree:  nearest-neighbour lookup using scipy.cKDTree  
-• B+-tree:  on-disk index way_id (uint32) ➜ file-offset (uint64)
+• KD-tree:       flat, left-balanced 2-d tree in Eytzinger (implicit) order
+• Offset table:  sorted key (uint64) ➜ offset (uint64) array, binary-searched
+• B+-tree:       legacy on-disk index way_id (uint32) ➜ file-offset (uint64)
 
 bplustree’s default **IntSerializer** handles *keys* that are Python
 ints.  *Values*, however, must already be **bytes** whose length does
@@ -11,10 +12,12 @@ as the value triggered the earlier ``len(value)`` TypeError.
 """
 from __future__ import annotations
 
+import mmap
+import os
 import struct
-from typing import Iterable, Tuple, List
+from typing import Iterable, Tuple
 
-from scipy.spatial import cKDTree
+import numpy as np
 import bplustree
 
 
@@ -22,17 +25,66 @@ import bplustree
 # KD-tree helpers                                                             #
 # --------------------------------------------------------------------------- #
 
-def build_kdtree(points: List[Tuple[float, float]]) -> cKDTree:
-    """Return a KD-tree built from *points* = [(x, y), …]."""
-    return cKDTree(points)
+_KDTREE_NODE_DTYPE = np.dtype([("idx", "<u4"), ("x", "<i4"), ("y", "<i4")])
 
 
-def serialize_kdtree(kd: cKDTree) -> bytes:
+def _left_subtree_size(n: np.ndarray) -> np.ndarray:
+    """Size of the left subtree of a left-balanced (complete) tree of *n* nodes."""
+    n = np.asarray(n, dtype=np.int64)
+    # frexp gives floor(log2(n)) exactly: n = m * 2**e with 0.5 <= m < 1
+    height = np.frexp(np.maximum(n, 1))[1].astype(np.int64) - 1
+    half_last = np.where(height > 0, 1 << np.maximum(height - 1, 0), 0)
+    last_level = n - ((1 << height) - 1)
+    return np.where(n > 1, half_last - 1 + np.minimum(last_level, half_last), 0)
+
+
+def build_flat_kdtree(points: np.ndarray) -> np.ndarray:
+    """
+    Return *points*, an ``(N, 2)`` array of (x, y), as a pointerless 2-d tree
+    in Eytzinger order: node ``i`` has children ``2i+1`` and ``2i+2`` and
+    splits on x at even depths, on y at odd ones.  The tree is left-balanced,
+    so the array has no holes.
+
+    Records are ``<uint32 idx><int32 x*1e6><int32 y*1e6>``, *idx* being the
+    point's row in *points*.  The tree is built one level at a time: a single
+    sort orders every subtree of the level by its split axis, and each
+    subtree's median becomes the node.
+    """
+    nodes = np.empty(len(points), dtype=_KDTREE_NODE_DTYPE)
+    # astype truncates toward zero, exactly like int()
+    xy = (np.asarray(points, dtype=np.float64) * 1e6).astype(np.int32)
+
+    order = np.arange(len(points))      # the level's subtrees, back to back
+    sizes = np.array([len(points)]) if len(points) else np.empty(0, dtype=np.int64)
+    placed = 0
+    depth = 0
+    while len(sizes):
+        # Sort by (subtree, coordinate) in one pass: subtree in the high bits
+        subtree = np.repeat(np.arange(len(sizes), dtype=np.int64), sizes)
+        coord = xy[order, depth % 2].astype(np.int64) + (1 << 31)
+        order = order[np.argsort((subtree << 32) | coord)]
+
+        left = _left_subtree_size(sizes)
+        median = np.cumsum(sizes) - sizes + left
+        level = order[median]
+        nodes["idx"][placed:placed + len(level)] = level
+        nodes["x"][placed:placed + len(level)] = xy[level, 0]
+        nodes["y"][placed:placed + len(level)] = xy[level, 1]
+        placed += len(level)
+
+        # Children: what precedes / follows each median, left then right
+        keep = np.ones(len(order), dtype=bool)
+        keep[median] = False
+        order = order[keep]
+        sizes = np.column_stack([left, sizes - left - 1]).ravel()
+        sizes = sizes[sizes > 0]
+        depth += 1
+    return nodes
+
+
+def serialize_kdtree(nodes: np.ndarray) -> bytes:
     """Serialize KD-tree nodes:  <uint32 idx><int32 x*1e6><int32 y*1e6>."""
-    buf = bytearray()
-    for idx, (x, y) in enumerate(kd.data):
-        buf.extend(struct.pack("<Iii", idx, int(x * 1e6), int(y * 1e6)))
-    return bytes(buf)
+    return nodes.tobytes()
 
 
 # --------------------------------------------------------------------------- #
@@ -40,6 +92,7 @@ def serialize_kdtree(kd: cKDTree) -> bytes:
 # --------------------------------------------------------------------------- #
 
 _pack_u64 = struct.Struct("<Q").pack          # little-endian uint64
+_BPLUSTREE_ORDER = 250                        # most 16-byte records per default 4 KiB page
 
 
 def build_bplustree(offsets: Iterable[Tuple[int, int]], path: str) -> None:
@@ -48,16 +101,55 @@ def build_bplustree(offsets: Iterable[Tuple[int, int]], path: str) -> None:
 
     * bplustree*’s default serializer accepts **int** keys directly.
     * Values **must** be bytes, so we pack the uint64 offset.
+    * Keys are bulk-loaded in ascending order with ``batch_insert`` (one
+      transaction, no per-key root-to-leaf search), which requires an empty
+      tree, so any file left at *path* by an earlier build is replaced.
     """
-    tree = bplustree.BPlusTree(path, key_size=4, value_size=8, order=50)
-
-    for way_id, offs in offsets:
-        tree.insert(way_id, _pack_u64(offs))
+    for stale in (path, path + "-wal"):
+        if os.path.exists(stale):
+            os.remove(stale)
 
+    tree = bplustree.BPlusTree(path, key_size=4, value_size=8, order=_BPLUSTREE_ORDER)
+    tree.batch_insert((way_id, _pack_u64(offs)) for way_id, offs in sorted(offsets))
     tree.close()
 
 
-def dump_bplustree(path: str) -> bytes:
-    """Return the raw bytes of a finished B+-tree file."""
+def dump_bplustree(path: str) -> mmap.mmap:
+    """
+    Return the raw bytes of a finished B+-tree file as a read-only memory
+    map: a bytes-like object backed by the page cache, so the tree is not
+    read onto the heap before being copied into its parcel.  The caller owns
+    the mapping; use it as a context manager so it is closed promptly.
+    """
     with open(path, "rb") as f:
-        return f.read()
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mm, "madvise"):  # Python 3.8+, not on Windows
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    return mm
+
+
+# --------------------------------------------------------------------------- #
+# Sorted offset table                                                         #
+# --------------------------------------------------------------------------- #
+
+OFFSET_TABLE_MAGIC = b"SDOT"
+OFFSET_TABLE_VERSION = 1
+OFFSET_TABLE_DTYPE = np.dtype([("key", "<u8"), ("offset", "<u8")])
+_OFFSET_TABLE_HDR = struct.Struct("<4sIQ")    # magic, version, row count
+
+
+def build_offset_table(keys: np.ndarray, offsets: np.ndarray) -> bytes:
+    """
+    Serialize a static *key* ➜ *offset* index as one sorted array.
+
+    Layout: a 16-byte header ``<4s "SDOT"><uint32 version><uint64 count>``
+    followed by *count* ``<uint64 key><uint64 offset>`` rows sorted by key.
+    The data is built once and only ever read, so readers can simply
+    ``np.searchsorted`` the key column instead of walking B+-tree pages.
+    """
+    table = np.empty(len(keys), dtype=OFFSET_TABLE_DTYPE)
+    table["key"] = keys
+    table["offset"] = offsets
+    table.sort(order="key", kind="stable")
+    header = _OFFSET_TABLE_HDR.pack(OFFSET_TABLE_MAGIC, OFFSET_TABLE_VERSION, len(table))
+    return header + table.tobytes()
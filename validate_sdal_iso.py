@@ -1,5 +1,12 @@
 #!/usr/bin/env python3
-import sys, io, zlib
+import sys, io
+from array import array
+
+# same CRC-32 as the encoder; zlib-ng when available
+try:
+    from zlib_ng.zlib_ng import crc32
+except ImportError:
+    from zlib import crc32
 
 # Dependency checks
 try:
@@ -18,6 +25,32 @@ except ImportError:
 FMT    = 'u16u32u32u16u16u8u8'
 HDR_LEN = bitstruct.calcsize(FMT) // 8
 
+# Dictionary-encoded name parcels (NAV_DICT_PARCEL_ID, POI_NAME_DICT_PARCEL_ID):
+# <u32 n_unique> + n_unique NUL-terminated strings + <u32 n> + n × <u32 index>
+DICT_NAME_PIDS = {121, 171}
+
+def check_name_dict(payload):
+    """Return why a dictionary-encoded name payload is malformed, or None."""
+    raw = bytes(payload)
+    if len(raw) < 4:
+        return "missing table size"
+    n_unique = int.from_bytes(raw[:4], "little")
+    parts = raw[4:].split(b"\x00", n_unique)
+    if len(parts) <= n_unique:
+        return f"string table holds fewer than {n_unique} entries"
+    rest = parts[-1]
+    if len(rest) < 4:
+        return "missing index count"
+    n = int.from_bytes(rest[:4], "little")
+    if len(rest) != 4 + 4 * n:
+        return f"index size mismatch (n={n}, bytes={len(rest) - 4})"
+    idx = array("I", rest[4:])
+    if sys.byteorder == "big":
+        idx.byteswap()
+    if n and max(idx) >= n_unique:
+        return "index out of range"
+    return None
+
 def validate_sdal_iso(iso_path):
     iso = PyCdlib()
     iso.open(iso_path)
@@ -35,7 +68,7 @@ def validate_sdal_iso(iso_path):
         print(f"\n=== Validating {fname} ===")
         buf = io.BytesIO()
         iso.get_file_from_iso_fp(buf, iso_path=f"/{fname}")
-        data = buf.getvalue()
+        data = buf.getbuffer()  # memoryview: payload slices below are not copied
 
         ptr, parcel_no, total = 0, 1, len(data)
         while ptr < total:
@@ -45,7 +78,7 @@ def validate_sdal_iso(iso_path):
                 break
 
             header = data[ptr:ptr+HDR_LEN]
-            pid, length, crc, *_ = bitstruct.unpack(FMT, header)
+            pid, length, crc, *_ = bitstruct.unpack(FMT, bytes(header))
 
             start, end = ptr + HDR_LEN, ptr + HDR_LEN + length
             if end > total:
@@ -54,12 +87,19 @@ def validate_sdal_iso(iso_path):
                 break
 
             payload = data[start:end]
-            calc_crc = zlib.crc32(payload) & 0xFFFFFFFF
+            calc_crc = crc32(payload) & 0xFFFFFFFF
             if calc_crc != crc:
                 print(f"  Parcel {parcel_no}: FAIL – CRC mismatch (hdr={crc:08x}, calc={calc_crc:08x})")
                 ok = False
                 break
 
+            if pid in DICT_NAME_PIDS:
+                err = check_name_dict(payload)
+                if err:
+                    print(f"  Parcel {parcel_no}: FAIL – bad name dictionary ({err})")
+                    ok = False
+                    break
+
             print(f"  Parcel {parcel_no}: OK (pid={pid}, size={length})")
             ptr, parcel_no = end, parcel_no + 1
 